@@ -0,0 +1,69 @@
+"""
+Square-kernel binary morphology shared by the blueprint scripts.
+
+A k×k square is separable, so erosion/dilation run as one horizontal and
+one vertical 1-D min/max pass (O(k) per pixel instead of O(k²)).
+Squares of VHGW_MIN_SIZE and up use the Van Herk / Gil-Werman passes
+from _morph_vhgw, whose cost does not grow with the kernel. Bool masks
+(odd sizes) take the bit-packed path from _morph_bits, 64 pixels a word.
+Pixels outside the image are ignored, matching Pillow's Min/MaxFilter.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+from scipy.ndimage import maximum_filter1d, minimum_filter1d
+
+from _morph_bits import dilate_square_bits, erode_square_bits
+from _morph_vhgw import dilate_square_vhgw, erode_square_vhgw
+
+VHGW_MIN_SIZE = 9  # wider squares switch to Van Herk / Gil-Werman
+
+
+def iterated_size(size: int, iterations: int) -> int:
+    """Side of the single square equivalent to `iterations` passes of `size`."""
+    return iterations * (size - 1) + 1
+
+
+def scaled_size(size: int, factor: int) -> int:
+    """Odd square side covering the same radius as `size` at 1/factor resolution."""
+    return 2 * round((size // 2) / factor) + 1
+
+
+def _result(value: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    if out is None:
+        return value
+    np.copyto(out, value)
+    return out
+
+
+def erode_square(mask: np.ndarray, size: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Erode with a size×size square, writing into `out` if given (may be `mask`)."""
+    if size <= 1:
+        return _result(mask.copy(), out)
+    if mask.dtype == np.bool_ and size % 2 == 1:
+        return erode_square_bits(mask, size, out)
+    if size >= VHGW_MIN_SIZE and size % 2 == 1:
+        return _result(erode_square_vhgw(mask, size), out)
+    partial = minimum_filter1d(mask, size, axis=0, mode="nearest")
+    return minimum_filter1d(partial, size, axis=1, mode="nearest", output=out)
+
+
+def dilate_square(mask: np.ndarray, size: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Dilate with a size×size square, writing into `out` if given (may be `mask`)."""
+    if size <= 1:
+        return _result(mask.copy(), out)
+    if mask.dtype == np.bool_ and size % 2 == 1:
+        return dilate_square_bits(mask, size, out)
+    if size >= VHGW_MIN_SIZE and size % 2 == 1:
+        return _result(dilate_square_vhgw(mask, size), out)
+    partial = maximum_filter1d(mask, size, axis=0, mode="nearest")
+    return maximum_filter1d(partial, size, axis=1, mode="nearest", output=out)
+
+
+def close_square(mask: np.ndarray, size: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Closing (dilate, then erode) with a size×size square, into `out` if given."""
+    closed = dilate_square(mask, size, out)
+    return erode_square(closed, size, closed)
@@ -0,0 +1,129 @@
+"""
+Bit-packed (SWAR) square morphology for 0/1 masks (Numba JIT).
+
+Rows are packed 64 pixels per uint64 word (pixel j of a word is bit j).
+A radius-1 horizontal step is then a couple of shifts and ORs (dilate)
+or ANDs (erode) per word, carrying the edge bit in from the neighbouring
+word; the vertical step combines each word with the rows above and
+below. A size×size square is size // 2 of each step. Out-of-image
+pixels are ignored, like the other morphology paths.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+from numba import njit, prange
+
+_ONE = np.uint64(1)
+_HIGH = np.uint64(63)
+_ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+@njit(parallel=True, cache=True)
+def _step_h(src, dst, erode):
+    h, nw = src.shape
+    edge = _ALL if erode else np.uint64(0)
+    for y in prange(h):
+        for i in range(nw):
+            c = src[y, i]
+            left = src[y, i - 1] if i > 0 else edge
+            right = src[y, i + 1] if i < nw - 1 else edge
+            from_left = (c << _ONE) | (left >> _HIGH)    # pixel j-1 moved to j
+            from_right = (c >> _ONE) | (right << _HIGH)  # pixel j+1 moved to j
+            if erode:
+                dst[y, i] = c & from_left & from_right
+            else:
+                dst[y, i] = c | from_left | from_right
+
+
+@njit(parallel=True, cache=True)
+def _step_v(src, dst, erode):
+    h, nw = src.shape
+    for y in prange(h):
+        for i in range(nw):
+            c = src[y, i]
+            if y > 0:
+                c = c & src[y - 1, i] if erode else c | src[y - 1, i]
+            if y < h - 1:
+                c = c & src[y + 1, i] if erode else c | src[y + 1, i]
+            dst[y, i] = c
+
+
+@njit(cache=True)
+def square_words(a, b, radius, erode):
+    """Erode/dilate packed words by a (2*radius+1) square, using `a` and `b`
+    as ping-pong buffers; returns whichever holds the result."""
+    for _ in range(radius):
+        _step_h(a, b, erode)
+        a, b = b, a
+    for _ in range(radius):
+        _step_v(a, b, erode)
+        a, b = b, a
+    return a
+
+
+@njit(cache=True)
+def fill_padding(words, w, value):
+    """Set the bits past column w in the last word of every row to `value`.
+
+    Chained operations must reset them: 1 before an erode, 0 before a dilate.
+    """
+    used = w - (words.shape[1] - 1) * 64
+    if used == 64:
+        return
+    pad = _ALL << np.uint64(used)
+    for y in range(words.shape[0]):
+        if value:
+            words[y, -1] |= pad
+        else:
+            words[y, -1] &= ~pad
+
+
+@njit(parallel=True, cache=True)
+def _pack(mask, pad, words):
+    h, w = mask.shape
+    nw = words.shape[1]
+    for y in prange(h):
+        for i in range(nw):
+            word = np.uint64(0)
+            for j in range(64):
+                x = i * 64 + j
+                if (mask[y, x] != 0) if x < w else pad:
+                    word |= _ONE << np.uint64(j)
+            words[y, i] = word
+
+
+@njit(parallel=True, cache=True)
+def _unpack(words, out):
+    h, w = out.shape
+    for y in prange(h):
+        for x in range(w):
+            out[y, x] = (words[y, x >> 6] >> np.uint64(x & 63)) & _ONE
+
+
+def _square(mask: np.ndarray, size: int, erode: bool, out: Optional[np.ndarray]) -> np.ndarray:
+    if size % 2 == 0:
+        raise ValueError(f"square size must be odd, got {size}")
+    h, w = mask.shape
+    a = np.empty((h, -(-w // 64)), dtype=np.uint64)
+    b = np.empty_like(a)
+    # padding bits beyond the image must never win: 1 for erode, 0 for dilate
+    _pack(mask.view(np.uint8), erode, a)
+    a = square_words(a, b, size // 2, erode)
+    if out is None:
+        out = np.empty_like(mask)
+    # unpacking is the last read of `mask`, so `out` may be the input buffer
+    _unpack(a, out.view(np.uint8))
+    return out
+
+
+def erode_square_bits(mask: np.ndarray, size: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Erode a 0/1 mask with a size×size square (size odd), into `out` if given."""
+    return _square(mask, size, True, out)
+
+
+def dilate_square_bits(mask: np.ndarray, size: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Dilate a 0/1 mask with a size×size square (size odd), into `out` if given."""
+    return _square(mask, size, False, out)
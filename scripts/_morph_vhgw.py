@@ -0,0 +1,74 @@
+"""
+Van Herk / Gil-Werman 1-D min filter (Numba JIT).
+
+Each line is split into blocks of k pixels; a running min from the block
+start (`prefix`) and from the block end (`suffix`) gives any k-wide
+window as min(suffix[j], prefix[j + k - 1]). That is ~3 comparisons per
+pixel whatever the kernel width, which pays off for the wide squares
+produced by iterated morphology. Out-of-image pixels are ignored.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, cache=True)
+def _vhgw_min_axis0(a, k, top, out):
+    # Filters down the columns one whole row at a time, so every inner
+    # loop walks contiguous memory and vectorizes. Blocks are independent
+    # and so are output rows, so both loops are spread across threads.
+    h, w = a.shape
+    r = k // 2
+    n = (h + 2 * r + k - 1) // k * k
+    line = np.full((n, w), top, dtype=a.dtype)  # `top` padding never wins a min
+    line[r:r + h] = a
+    prefix = np.empty_like(line)
+    suffix = np.empty_like(line)
+    for block in prange(n // k):
+        b = block * k
+        prefix[b] = line[b]
+        for i in range(b + 1, b + k):
+            for x in range(w):
+                prefix[i, x] = min(prefix[i - 1, x], line[i, x])
+        suffix[b + k - 1] = line[b + k - 1]
+        for i in range(b + k - 2, b - 1, -1):
+            for x in range(w):
+                suffix[i, x] = min(suffix[i + 1, x], line[i, x])
+    for y in prange(h):
+        for x in range(w):
+            out[y, x] = min(suffix[y, x], prefix[y + k - 1, x])
+
+
+def _min_square(a: np.ndarray, size: int, top: int) -> np.ndarray:
+    vertical = np.empty_like(a)
+    _vhgw_min_axis0(np.ascontiguousarray(a), size, top, vertical)
+    # horizontal pass on the transpose so it also runs row-wise
+    horizontal = np.empty_like(vertical.T)
+    _vhgw_min_axis0(np.ascontiguousarray(vertical.T), size, top, horizontal)
+    return horizontal.T
+
+
+def _as_integer(mask: np.ndarray):
+    if mask.dtype == np.bool_:
+        return mask.view(np.uint8), 1
+    return mask, np.iinfo(mask.dtype).max
+
+
+def erode_square_vhgw(mask: np.ndarray, size: int) -> np.ndarray:
+    """Erode an integer/bool mask with a size×size square (size odd)."""
+    if size % 2 == 0:
+        raise ValueError(f"square size must be odd, got {size}")
+    a, top = _as_integer(mask)
+    return _min_square(a, size, top).view(mask.dtype)
+
+
+def dilate_square_vhgw(mask: np.ndarray, size: int) -> np.ndarray:
+    """Dilate an integer/bool mask with a size×size square (size odd)."""
+    if size % 2 == 0:
+        raise ValueError(f"square size must be odd, got {size}")
+    # dilation is erosion of the complement: max(a) == top - min(top - a)
+    a, top = _as_integer(mask)
+    inverted = top - a
+    return (top - _min_square(inverted, size, top)).astype(a.dtype, copy=False).view(mask.dtype)
@@ -0,0 +1,89 @@
+"""
+Fused remove_interior_lines kernels (Numba JIT).
+
+The wall morphology stays in the packed-bit domain of _morph_bits from
+end to end. Binarization is folded into the first pack, the keep lookup
+into the second, and the inversion plus nearest-neighbour upscale into
+the final unpack. Each image then costs two compiled calls around the
+scipy labelling step instead of a pack/unpack round trip per operation.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from numba import njit, prange
+
+from _morph_bits import fill_padding, square_words
+
+_ONE = np.uint64(1)
+
+
+@njit(parallel=True, cache=True)
+def _pack_below(gray, threshold, words):
+    # bit = gray < threshold (walls); padding left at 1 for the first erode
+    h, w = gray.shape
+    for y in prange(h):
+        for i in range(words.shape[1]):
+            word = np.uint64(0)
+            for j in range(64):
+                x = i * 64 + j
+                if x >= w or gray[y, x] < threshold:
+                    word |= _ONE << np.uint64(j)
+            words[y, i] = word
+
+
+@njit(parallel=True, cache=True)
+def _pack_kept(labels, keep, words):
+    # bit = keep[label]; padding left at 1 for the thinning erode
+    h, w = labels.shape
+    for y in prange(h):
+        for i in range(words.shape[1]):
+            word = np.uint64(0)
+            for j in range(64):
+                x = i * 64 + j
+                if x >= w or keep[labels[y, x]]:
+                    word |= _ONE << np.uint64(j)
+            words[y, i] = word
+
+
+@njit(parallel=True, cache=True)
+def wall_candidates(gray, threshold, open_radius, reconnect_radius, out):
+    """
+    Threshold, open (erode then dilate by open_radius) and reconnect
+    (dilate by reconnect_radius) in one go, writing the bool mask to `out`.
+    The two dilations compose into one of radius open_radius + reconnect_radius.
+    """
+    h, w = gray.shape
+    a = np.empty((h, (w + 63) // 64), dtype=np.uint64)
+    b = np.empty_like(a)
+    _pack_below(gray, threshold, a)
+    a = square_words(a, b, open_radius, True)
+    fill_padding(a, w, False)  # dilation must not grow out of the padding
+    a = square_words(a, np.empty_like(a), open_radius + reconnect_radius, False)
+    for y in prange(h):
+        for x in range(w):
+            out[y, x] = (a[y, x >> 6] >> np.uint64(x & 63)) & _ONE
+
+
+@njit(parallel=True, cache=True)
+def thinned_walls(labels, keep, thin_radius, factor, out):
+    """
+    Keep the labelled components flagged in `keep`, erode by thin_radius and
+    write walls black (0) on white (255) into `out`, upscaling by `factor`.
+    """
+    h, w = labels.shape
+    a = np.empty((h, (w + 63) // 64), dtype=np.uint64)
+    b = np.empty_like(a)
+    _pack_kept(labels, keep, a)
+    a = square_words(a, b, thin_radius, True)
+    oh, ow = out.shape
+    for sy in prange(h):
+        # expand one source row to full width, then copy it `factor` times
+        y0 = sy * factor
+        row = out[y0]
+        for sx in range(w):
+            value = 0 if (a[sy, sx >> 6] >> np.uint64(sx & 63)) & _ONE else 255
+            for x in range(sx * factor, min(sx * factor + factor, ow)):
+                row[x] = value
+        for y in range(y0 + 1, min(y0 + factor, oh)):
+            out[y] = row
@@ -1,11 +1,12 @@
 """
 Wall-only extractor (no OpenCV required).
 
-Replicates the provided OpenCV flow using Pillow + NumPy:
+Replicates the provided OpenCV flow using Pillow + NumPy + SciPy + Numba:
 - Otsu binarization (walls => white).
 - Morphological opening with a square kernel to drop thin strokes.
 - Dilation to reconnect walls.
 - Connected-components filter to remove small blobs (furniture/fixtures).
+- Scans larger than DOWNSCALE_ABOVE_PX run these steps at reduced size.
 
 Usage:
   python3 scripts/remove_interior_lines.py <input_image> <output_image>
@@ -20,130 +21,91 @@ from pathlib import Path
 from typing import Tuple
 
 import numpy as np
-from PIL import Image, ImageFilter
+from PIL import Image
+from scipy.ndimage import label
+
+from _morph import iterated_size, scaled_size
+from _pipeline import thinned_walls, wall_candidates
 
 # ---------- PARAMETERS (tune once per blueprint style) ----------
 MIN_WALL_THICKNESS_PX = 6     # anything thinner is removed
 MIN_COMPONENT_AREA_PX = 1200   # remove small objects (furniture)
 DILATION_ITERATIONS = 2        # reconnect wall segments
 EROSION_ITERATIONS = 6         # thin the final walls
+DOWNSCALE_ABOVE_PX = 2000      # larger images run morphology/CC at reduced size
+DOWNSCALE_FACTOR = 2
 # ---------------------------------------------------------------
 
+FOUR_CONNECTED = np.array([[0, 1, 0], [1, 1, 1], [0, 1, 0]], dtype=bool)
+
 
 def otsu_threshold(gray: np.ndarray) -> int:
     """Compute Otsu threshold for an 8-bit grayscale image."""
-    hist, _ = np.histogram(gray, bins=256, range=(0, 256))
-    total = gray.size
-    sum_total = np.dot(np.arange(256), hist)
-
-    sum_b = 0.0
-    w_b = 0.0
-    max_var = -1.0
-    threshold = 0
-
-    for t in range(256):
-        w_b += hist[t]
-        if w_b == 0:
-            continue
-        w_f = total - w_b
-        if w_f == 0:
-            break
-        sum_b += t * hist[t]
-        m_b = sum_b / w_b
-        m_f = (sum_total - sum_b) / w_f
-        var_between = w_b * w_f * (m_b - m_f) ** 2
-        if var_between > max_var:
-            max_var = var_between
-            threshold = t
-    return threshold
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    w_b = np.cumsum(hist)                 # background weight for each threshold
+    w_f = gray.size - w_b                 # foreground weight
+    sum_b = np.cumsum(levels * hist)
+    sum_total = sum_b[-1]
+    m_b = sum_b / np.maximum(w_b, 1)
+    m_f = (sum_total - sum_b) / np.maximum(w_f, 1)
+    var_between = w_b * w_f * (m_b - m_f) ** 2
+    return int(np.argmax(var_between))
 
 
 def connected_components(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Simple 4-connected components on binary mask (1 = foreground).
-    Returns labels array (int32) and stats array shaped (n, 5)
-    matching OpenCV's CC_STAT_* order: [x, y, w, h, area].
+    4-connected components on binary mask (1 = foreground).
+    Returns labels array (int32, 0 = background, components numbered from 1)
+    and areas array indexed by label (areas[0] counts the background).
     """
-    h, w = mask.shape
-    labels = -np.ones_like(mask, dtype=np.int32)
-    stats = []
-    current = 0
-    stack = []
-
-    for y in range(h):
-        for x in range(w):
-            if mask[y, x] == 0 or labels[y, x] != -1:
-                continue
-            # flood fill
-            stack.append((x, y))
-            labels[y, x] = current
-            area = 0
-            min_x = max_x = x
-            min_y = max_y = y
-            while stack:
-                cx, cy = stack.pop()
-                area += 1
-                min_x = min(min_x, cx)
-                max_x = max(max_x, cx)
-                min_y = min(min_y, cy)
-                max_y = max(max_y, cy)
-                for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
-                    nx, ny = cx + dx, cy + dy
-                    if nx < 0 or nx >= w or ny < 0 or ny >= h:
-                        continue
-                    if mask[ny, nx] == 0 or labels[ny, nx] != -1:
-                        continue
-                    labels[ny, nx] = current
-                    stack.append((nx, ny))
-            stats.append((min_x, min_y, max_x - min_x + 1, max_y - min_y + 1, area))
-            current += 1
-    return labels, np.array(stats, dtype=np.int32)
+    labels = np.empty(mask.shape, dtype=np.int32)
+    n = label(mask, structure=FOUR_CONNECTED, output=labels)
+    areas = np.bincount(labels.ravel(), minlength=n + 1)
+    return labels, areas
 
 
 def remove_interior_lines(input_path: str, output_path: str) -> None:
     img = Image.open(input_path).convert("L")  # grayscale
-    gray = np.array(img, dtype=np.uint8)
+    gray = np.asarray(img)  # already uint8, no copy
+    h, w = gray.shape
 
     # Otsu binarization, invert so walls become white
     t = otsu_threshold(gray)
-    binary = (gray < t).astype(np.uint8) * 255  # walls = 255
 
-    # Morphological opening to drop thin strokes
+    # Large scans: morphology and CC are insensitive to small positional
+    # errors, so run them on a box-averaged copy and upscale the result.
+    # Kernel sizes and areas below are in full-resolution pixels.
+    factor = DOWNSCALE_FACTOR if max(h, w) > DOWNSCALE_ABOVE_PX else 1
+    if factor > 1:
+        gray = np.asarray(img.reduce(factor))
+
+    # Square radii in working pixels (full-resolution sizes scaled by factor)
     size = max(1, MIN_WALL_THICKNESS_PX | 1)  # ensure odd size for filters
-    opened = Image.fromarray(binary).filter(ImageFilter.MinFilter(size=size))  # erosion
-    opened = opened.filter(ImageFilter.MaxFilter(size=size))  # dilation (opening)
-
-    # Dilation to reconnect walls
-    dilated = opened
-    if DILATION_ITERATIONS > 0:
-        for _ in range(DILATION_ITERATIONS):
-            dilated = dilated.filter(ImageFilter.MaxFilter(size=size))
-
-    arr = (np.array(dilated) > 0).astype(np.uint8)  # 1 = wall candidate
-
-    labels, stats = connected_components(arr)
-
-    # Keep only sufficiently large components
-    keep = set()
-    for idx, (_, _, _, _, area) in enumerate(stats):
-        if area >= MIN_COMPONENT_AREA_PX:
-            keep.add(idx)
-
-    clean = np.zeros_like(arr, dtype=np.uint8)
-    for idx in keep:
-        clean[labels == idx] = 1
-
-    # Erosion to thin the walls
-    thinned = Image.fromarray((clean * 255).astype(np.uint8))
-    if EROSION_ITERATIONS > 0:
-        erosion_size = max(1, (MIN_WALL_THICKNESS_PX // 2) | 1)  # smaller kernel for thinning
-        for _ in range(EROSION_ITERATIONS):
-            thinned = thinned.filter(ImageFilter.MinFilter(size=erosion_size))
-    clean = (np.array(thinned) > 0).astype(np.uint8)
-
-    # Invert back: walls black on white
-    final = (1 - clean) * 255
-    Image.fromarray(final.astype(np.uint8), mode="L").save(output_path)
+    erosion_size = max(1, (MIN_WALL_THICKNESS_PX // 2) | 1)  # smaller kernel for thinning
+    open_radius = scaled_size(size, factor) // 2
+    reconnect_radius = scaled_size(iterated_size(size, DILATION_ITERATIONS), factor) // 2
+    thin_radius = scaled_size(iterated_size(erosion_size, EROSION_ITERATIONS), factor) // 2
+
+    # Binarize (walls = True), open to drop thin strokes and dilate to
+    # reconnect walls, fused in one compiled pass over packed bits
+    mask = np.empty(gray.shape, dtype=bool)
+    wall_candidates(gray, t, open_radius, reconnect_radius, mask)
+
+    labels, areas = connected_components(mask)
+
+    # Keep only sufficiently large components: a bool table indexed by label
+    keep = areas >= MIN_COMPONENT_AREA_PX / factor**2
+    keep[0] = False  # background
+
+    # Apply it, erode to thin the walls and invert back (walls black on
+    # white), upscaling to full resolution in the same pass
+    final = np.empty((h, w), dtype=np.uint8)
+    thinned_walls(labels, keep, thin_radius, factor, final)
+    # fast zlib level: flat wall/background regions still compress well
+    Image.fromarray(final, mode="L").save(
+        output_path, optimize=False, compress_level=1
+    )
     print(f"Walls-only image saved to: {output_path}")
 
 